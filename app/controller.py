@@ -20,7 +20,7 @@ from app.modify_model_in_viktor import (
 from app.update_revit_model import (
     ensure_input_json,
     select_original_rvt,
-    read_staged_files,
+    stage_files,
     prepare_update_worker_script,
     run_update_worker,
     persist_updated_model,
@@ -324,7 +324,8 @@ class Controller(vkt.Controller):
             return vkt.PlotlyResult(figure=model_viz.default_blank_scene())
 
         working = prepare_working_copy(data, _ctx=ctx) or data
-        parsed = parse_revit_model(working, _ctx=ctx)
+        # Parse even if the working copy failed: the raw data is the fallback
+        parsed = parse_revit_model(working, _ctx=ctx, _force=True)
 
         if parsed is None:
             ctx.reraise()
@@ -358,11 +359,11 @@ class Controller(vkt.Controller):
             ctx.reraise()
             return None
 
-        staged = read_staged_files(model_path, input_json_path, _ctx=ctx)
+        staged = stage_files(model_path, input_json_path, _ctx=ctx)
         if staged is None:
             ctx.reraise()
             return None
-        model_bytes, input_json_bytes = staged
+        model_file, input_json_file = staged
 
         script = prepare_update_worker_script(Path(__file__).parent, _ctx=ctx)
         if script is None:
@@ -372,8 +373,8 @@ class Controller(vkt.Controller):
         updated_bytes = run_update_worker(
             script,
             model_path.name,
-            model_bytes,
-            input_json_bytes,
+            model_file,
+            input_json_file,
             _ctx=ctx,
         )
         if updated_bytes is None:
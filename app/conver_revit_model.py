@@ -83,33 +83,9 @@ def run_revit_worker(safe_name: str, raw_bytes: bytes, script_path: Path | None
     if output_file_obj is None:
         raise RuntimeError("revit worker did not produce output.json")
 
-    # Many SDK file-like objects expose getvalue(); try common accessors
-    contents = None
-    for attempt in ("getvalue", "get_bytes", "read", "read_bytes"):
-        func = getattr(output_file_obj, attempt, None)
-        if callable(func):
-            try:
-                contents = func()
-            except TypeError:
-                try:
-                    contents = func(binary=True)
-                except Exception:
-                    try:
-                        contents = func(as_bytes=True)
-                    except Exception:
-                        continue
-            except Exception:
-                continue
-        if contents is not None:
-            break
-
-    if contents is None:
-        raise RuntimeError("Could not read output.json from worker result")
-
-    if isinstance(contents, (bytes, bytearray)):
-        text = contents.decode("utf-8", errors="ignore")
-    else:
-        text = str(contents)
+    # get_output_file returns a viktor File; read it the same way the update worker does
+    contents = output_file_obj.getvalue_binary()
+    text = contents.decode("utf-8", errors="ignore")
 
     try:
         output_json = json.loads(text)
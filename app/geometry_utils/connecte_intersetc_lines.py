@@ -221,8 +221,8 @@
 #     return new_nodes, new_lines, new_members, mother_to_children, child_to_mother
 from __future__ import annotations
 
-from math import isfinite
-from typing import Annotated
+from math import ceil, isfinite, sqrt
+from typing import Annotated, Any
 
 from app.app_types import (
     NodesDict,
@@ -288,6 +288,23 @@ def findExistingNode(
     return None
 
 
+def findExistingNodeXYZ(
+    node_ids: list[int],
+    xs: list[float],
+    ys: list[float],
+    zs: list[float],
+    x: float,
+    y: float,
+    z: float,
+    tol: float,
+) -> int | None:
+    """findExistingNode over parallel coordinate lists (same first-match order)."""
+    for nid, nx, ny, nz in zip(node_ids, xs, ys, zs):
+        if abs(nx - x) <= tol and abs(ny - y) <= tol and abs(nz - z) <= tol:
+            return nid
+    return None
+
+
 def cloneNodes(nodes: NodesDict) -> NodesDict:
     return {k: {"id": v["id"], "x": v["x"], "y": v["y"], "z": v["z"]} for k, v in nodes.items()}
 
@@ -347,10 +364,128 @@ def pointOnSegmentXY(a: tuple[float, float], b: tuple[float, float], p: tuple[fl
 def sameElevation(z1: float, z2: float, tol: float) -> bool:
     return abs(z1 - z2) <= tol
 
+# -------------------------------
+# Spatial index (STR packed R-tree over plan boxes)
+# -------------------------------
+
+Box2 = tuple[float, float, float, float]  # (xmin, xmax, ymin, ymax)
+
+
+def boxesOverlap(a: Box2, b: Box2) -> bool:
+    return not (b[1] < a[0] or b[0] > a[1] or b[3] < a[2] or b[2] > a[3])
+
+
+def planBox(ax: float, ay: float, bx: float, by: float, tol: float) -> Box2:
+    """Plan box of segment a-b, padded by the parametric tolerance segmentIntersectionXY
+    accepts (t in [-tol, 1 + tol]), so the box test never rejects a real hit."""
+    pad_x = tol * (abs(bx - ax) + 1.0)
+    pad_y = tol * (abs(by - ay) + 1.0)
+    return (min(ax, bx) - pad_x, max(ax, bx) + pad_x, min(ay, by) - pad_y, max(ay, by) + pad_y)
+
+
+def _unionBox(items: list[tuple[Box2, Any]]) -> Box2:
+    return (
+        min(it[0][0] for it in items),
+        max(it[0][1] for it in items),
+        min(it[0][2] for it in items),
+        max(it[0][3] for it in items),
+    )
+
+
+def _strPack(items: list[tuple[Box2, Any]], node_size: int, is_leaf: bool) -> list[tuple[Box2, Any]]:
+    """One Sort-Tile-Recursive level: x-sorted slabs, each y-sorted into nodes."""
+    n_nodes = ceil(len(items) / node_size)
+    slab_size = ceil(sqrt(n_nodes)) * node_size
+    items = sorted(items, key=lambda it: it[0][0] + it[0][1])
+    packed: list[tuple[Box2, Any]] = []
+    for s in range(0, len(items), slab_size):
+        slab = sorted(items[s:s + slab_size], key=lambda it: it[0][2] + it[0][3])
+        for k in range(0, len(slab), node_size):
+            children = slab[k:k + node_size]
+            packed.append((_unionBox(children), (children, is_leaf)))
+    return packed
+
+
+def buildBoxTree(boxes: list[Box2], node_size: int = 16) -> tuple[Box2, Any] | None:
+    """Bulk load an R-tree whose leaf payloads are the indices into `boxes`."""
+    if not boxes:
+        return None
+    level: list[tuple[Box2, Any]] = [(b, i) for i, b in enumerate(boxes)]
+    is_leaf = True
+    while True:
+        level = _strPack(level, node_size, is_leaf)
+        if len(level) == 1:
+            return level[0]
+        is_leaf = False
+
+
+def queryBoxTree(tree: tuple[Box2, Any] | None, box: Box2) -> list[int]:
+    """Indices of every stored box overlapping `box` (unordered)."""
+    hits: list[int] = []
+    if tree is None:
+        return hits
+    stack = [tree]
+    while stack:
+        children, is_leaf = stack.pop()[1]
+        for child in children:
+            if not boxesOverlap(box, child[0]):
+                continue
+            if is_leaf:
+                hits.append(child[1])
+            else:
+                stack.append(child)
+    return hits
+
 # -------------------------------
 # Core splitting
 # -------------------------------
 
+# Segment record used by the pair search: (x1, y1, x2, y2, z_mid, dx, dy)
+# Keep these in double precision: model coordinates can be large (e.g. 1e5) and
+# float32 only resolves ~7 digits, which is coarser than the 1e-4 snapping tol,
+# and den = dxp*dyq - dyp*dxq cancels badly for near-parallel lines.
+SegXY = tuple[float, float, float, float, float, float, float]
+# Pair hit: (i, j, x, y, t_on_i, u_on_j, z)
+PairHit = tuple[int, int, float, float, float, float, float]
+
+def _pairwiseHits(
+    segs: list[SegXY],
+    boxes: list[Box2],
+    tree: tuple[Box2, Any] | None,
+    tol: float,
+    tol_z: float,
+) -> list[PairHit]:
+    """Intersections of every line against every later line, in (i, j) order."""
+    hits: list[PairHit] = []
+    hi = 1.0 + tol
+    for i in range(len(segs)):
+        x1, y1, _, _, zi, dxp, dyp = segs[i]
+        # ascending j keeps node ids and split order identical to the full scan
+        candidates = sorted(j for j in queryBoxTree(tree, boxes[i]) if j > i)
+        for j in candidates:
+            x3, y3, _, _, zj, dxq, dyq = segs[j]
+            if abs(zi - zj) > tol_z:
+                continue
+            # segmentIntersectionXY inlined on the precomputed deltas
+            den = dxp * dyq - dyp * dxq
+            if abs(den) <= tol:
+                continue
+            rx = x3 - x1
+            ry = y3 - y1
+            t = (rx * dyq - ry * dxq) / den
+            u = (rx * dyp - ry * dxp) / den
+            if t < -tol or t > hi or u < -tol or u > hi:
+                continue
+            t = min(max(t, 0.0), 1.0)
+            u = min(max(u, 0.0), 1.0)
+            xi = x1 + t * dxp
+            yi = y1 + t * dyp
+            if not (isfinite(xi) and isfinite(yi)):
+                continue
+            hits.append((i, j, xi, yi, t, u, (zi + zj) * 0.5))
+    return hits
+
+
 def collectIntersections(
     new_nodes: NodesDict,
     new_lines: LinesDict,
@@ -359,41 +494,49 @@ def collectIntersections(
     next_node_id: int,
 ) -> int:
     line_ids = list(new_lines.keys())
-    n_lines = len(line_ids)
     # relax the plane check slightly to tolerate small modeling noise
     tol_z = max(tol, 10.0 * tol)
-    for i in range(n_lines):
-        lid_i = line_ids[i]
-        li = new_lines[lid_i]
-        Pi = new_nodes[li["Ni"]]
-        Pj = new_nodes[li["Nj"]]
-        p1 = (Pi["x"], Pi["y"])  # type: ignore[index]
-        p2 = (Pj["x"], Pj["y"])  # type: ignore[index]
-        zi = (Pi["z"] + Pj["z"]) * 0.5
-        for j in range(i + 1, n_lines):
-            lid_j = line_ids[j]
-            lj = new_lines[lid_j]
-            Qi = new_nodes[lj["Ni"]]
-            Qj = new_nodes[lj["Nj"]]
-            q1 = (Qi["x"], Qi["y"])  # type: ignore[index]
-            q2 = (Qj["x"], Qj["y"])  # type: ignore[index]
-            zj = (Qi["z"] + Qj["z"]) * 0.5
-            if abs(zi - zj) > tol_z:
-                continue
-            hit = segmentIntersectionXY(p1, p2, q1, q2, tol=tol)
-            if not hit:
-                continue
-            xi, yi, ti, uj = hit
-            zi_use = (zi + zj) * 0.5
-            existing = findExistingNode(new_nodes, xi, yi, zi_use, tol=tol)  # use tol
-            if existing is None:
-                nid = next_node_id
-                next_node_id += 1
-                new_nodes[nid] = {"id": nid, "x": float(xi), "y": float(yi), "z": float(zi_use)}
-            else:
-                nid = existing
-            splits_by_line[lid_i].append((ti, nid))
-            splits_by_line[lid_j].append((uj, nid))
+    segs: list[SegXY] = []
+    boxes: list[Box2] = []
+    for lid in line_ids:
+        ln = new_lines[lid]
+        a = new_nodes[ln["Ni"]]
+        b = new_nodes[ln["Nj"]]
+        segs.append((
+            a["x"], a["y"], b["x"], b["y"], (a["z"] + b["z"]) * 0.5, b["x"] - a["x"], b["y"] - a["y"]
+        ))
+        boxes.append(planBox(a["x"], a["y"], b["x"], b["y"], tol))
+
+    # No two lines share an elevation band: nothing can intersect, skip the search
+    z_sorted = sorted(seg[4] for seg in segs)
+    if all(b - a > tol_z for a, b in zip(z_sorted, z_sorted[1:])):
+        return next_node_id
+
+    # Phase 1: find every crossing. Candidate pairs come from the tree instead of
+    # scanning every j > i.
+    tree = buildBoxTree(boxes)
+    hits = _pairwiseHits(segs, boxes, tree, tol, tol_z)
+
+    # Phase 2: serial merge, node ids are allocated in (i, j) order as before.
+    # Coordinates are mirrored into flat lists so the duplicate scan avoids dict lookups.
+    node_ids = list(new_nodes)
+    xs = [nd["x"] for nd in new_nodes.values()]
+    ys = [nd["y"] for nd in new_nodes.values()]
+    zs = [nd["z"] for nd in new_nodes.values()]
+    for i, j, xi, yi, ti, uj, zi_use in hits:
+        existing = findExistingNodeXYZ(node_ids, xs, ys, zs, xi, yi, zi_use, tol=tol)  # use tol
+        if existing is None:
+            nid = next_node_id
+            next_node_id += 1
+            new_nodes[nid] = {"id": nid, "x": float(xi), "y": float(yi), "z": float(zi_use)}
+            node_ids.append(nid)
+            xs.append(float(xi))
+            ys.append(float(yi))
+            zs.append(float(zi_use))
+        else:
+            nid = existing
+        splits_by_line[line_ids[i]].append((ti, nid))
+        splits_by_line[line_ids[j]].append((uj, nid))
     return next_node_id
 
 
@@ -403,9 +546,15 @@ def buildChildren(
     splits_by_line: dict[int, list[tuple[float, int]]],
     next_line_id: int,
 ) -> tuple[LinesDict, MembersDict, MotherToChildrenMap, ChildToMotherMap, int]:
+    # Every input line gets its mapping here (itself, or its children once split),
+    # so no second pass over the original lines is needed afterwards.
     mother_to_children: MotherToChildrenMap = {lid: [] for lid in new_lines}  # type: ignore[assignment]
     child_to_mother: ChildToMotherMap = {}  # type: ignore[assignment]
-    mothers_to_remove: list[int] = []
+    mothers_to_remove: set[int] = set()
+    # line id -> first member on it, so a mother's member is popped in O(1)
+    line_to_member: dict[int, int] = {}
+    for mid, m in new_members.items():
+        line_to_member.setdefault(m["line_id"], mid)
     for lid, param_nodes in splits_by_line.items():
         param_nodes = sorted(param_nodes, key=lambda tn: tn[0])
         dedup: list[tuple[float, int]] = []
@@ -416,13 +565,9 @@ def buildChildren(
             mother_to_children[lid].append(lid)
             child_to_mother[lid] = lid
             continue
-        mothers_to_remove.append(lid)
-        mother_member: MemberInfo | None = None
-        for mid, m in list(new_members.items()):
-            if m["line_id"] == lid:
-                mother_member = m
-                del new_members[mid]
-                break
+        mothers_to_remove.add(lid)
+        mid = line_to_member.pop(lid, None)
+        mother_member: MemberInfo | None = new_members.pop(mid, None) if mid is not None else None
         for k in range(len(dedup) - 1):
             nid_a = dedup[k][1]
             nid_b = dedup[k + 1][1]
@@ -439,9 +584,9 @@ def buildChildren(
                     "cross_section_id": mother_member["cross_section_id"],
                     "material_name": mother_member["material_name"],
                 }
-    for lid in mothers_to_remove:
-        if lid in new_lines:
-            del new_lines[lid]
+                line_to_member[child_id] = child_id
+    # single rebuild instead of one del per split mother
+    new_lines = {k: v for k, v in new_lines.items() if k not in mothers_to_remove}
     return new_lines, new_members, mother_to_children, child_to_mother, next_line_id
 
 # -------------------------------
@@ -502,23 +647,6 @@ def augmentMappingsWithExistingSegments(
             mother_to_children[mother_id].append(cand_id)
             child_to_mother[cand_id] = mother_id
 
-# -------------------------------
-# Finalization
-# -------------------------------
-
-def finalizeMappings(
-    original_lines: LinesDict,
-    new_lines: LinesDict,
-    mother_to_children: MotherToChildrenMap,
-    child_to_mother: ChildToMotherMap,
-) -> None:
-    for lid in list(original_lines.keys()):
-        if lid not in mother_to_children:
-            mother_to_children[lid] = []  # type: ignore[index]
-        if not mother_to_children[lid] and lid in new_lines:
-            mother_to_children[lid] = [lid]  # type: ignore[index]
-            child_to_mother[lid] = lid  # type: ignore[index]
-
 # -------------------------------
 # Entry point
 # -------------------------------
@@ -540,6 +668,10 @@ def connect_lines_at_intersections(
     new_lines = cloneLines(lines)
     new_members = cloneMembers(members)
 
+    # Fewer than two lines: nothing to split, every line is its own child
+    if len(new_lines) < 2:
+        return new_nodes, new_lines, new_members, {lid: [lid] for lid in new_lines}, {lid: lid for lid in new_lines}
+
     splits_by_line = initSplitParams(new_lines)
     next_node_id = max(new_nodes) + 1 if new_nodes else 1
     next_line_id = max(new_lines) + 1 if new_lines else 1
@@ -554,7 +686,6 @@ def connect_lines_at_intersections(
         new_nodes, new_lines, mother_to_children, child_to_mother, tol=tol
     )
 
-    finalizeMappings(lines, new_lines, mother_to_children, child_to_mother)
-
     print(f"[DEBUG] {child_to_mother=}, {mother_to_children=}")
     return new_nodes, new_lines, new_members, mother_to_children, child_to_mother
+
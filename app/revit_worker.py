@@ -3,8 +3,8 @@ import subprocess
 import json
 from json import JSONDecodeError
 from pathlib import Path
-from typing import Callable, Optional, Any
-from functools import wraps
+from typing import Iterator, Optional
+from contextlib import contextmanager
 
 
 PYREVIT_SCRIPT: Path = Path(os.environ["APPDATA"]) / "pyRevit-Master" / "extensions" / "PullAnalyticalModel.extension" / "PullAnalyticalModel.tab" / "Exports.panel" / "ExportAnalytical.pushbutton" / "script.py"
@@ -14,36 +14,27 @@ class StepErrors:
     def __init__(self) -> None:
         self.errors: list[BaseException] = []
 
+    @contextmanager
+    def step(self, label: str) -> Iterator[None]:
+        """Collect any exception raised inside the block into self.errors.
+
+        Usage: ``with ctx.step("label"): value = fn()``. On failure the block is
+        abandoned, so callers should pre-assign anything they read afterwards.
+        """
+        try:
+            yield
+        except BaseException as e:
+            try:
+                e.add_note(f"step={label}")
+            except Exception:
+                pass
+            self.errors.append(e)
+
     def reraise(self) -> None:
         if self.errors:
             raise ExceptionGroup("one or more steps failed", self.errors)
 
 
-def step(label: str) -> Callable[[Callable[..., Any]], Callable[..., Optional[Any]]]:
-    """Decorator that collects exceptions into ctx.errors and returns None on failure.
-
-    The wrapped function must be called with keyword argument _ctx=StepErrors.
-    """
-    def decorator(fn: Callable[..., Any]) -> Callable[..., Optional[Any]]:
-        @wraps(fn)
-        def wrapped(*args: Any, **kwargs: Any) -> Optional[Any]:
-            ctx = kwargs.pop("_ctx", None)
-            if not isinstance(ctx, StepErrors):
-                raise RuntimeError(f"{fn.__name__} requires _ctx=StepErrors")
-            try:
-                return fn(*args, **kwargs)
-            except BaseException as e:
-                try:
-                    e.add_note(f"step={label}")
-                except Exception:
-                    pass
-                ctx.errors.append(e)
-                return None
-        return wrapped
-    return decorator
-
-
-@step("find_local_rvt")
 def find_local_rvt() -> Path:
     """Return the first *.rvt file that sits in the same directory as this worker."""
     script_dir = Path(__file__).parent
@@ -53,29 +44,28 @@ def find_local_rvt() -> Path:
     return rvts[0].resolve()
 
 
-@step("ensure_output_dir")
 def ensure_output_dir(folder: Path) -> None:
     folder.mkdir(parents=True, exist_ok=True)
 
 
-@step("set_out_env")
 def set_out_env(folder: Path) -> None:
     """The way of telling pyreivt where to place the output json"""
     os.environ["REVIT_ANALYTICAL_OUT"] = str(folder.resolve())
 
 
-@step("run_pyrevit")
 def run_pyrevit(script_path: str, model_path: Path) -> None:
     """Run the pyRevit command that produces JSON outputs."""
-    cmd = ["pyrevit", "run", script_path, str(model_path)]
-    res = subprocess.run(cmd, check=True, capture_output=True, text=True)
-    if res.stdout:
-        print(res.stdout)
-    if res.stderr:
-        print(res.stderr)
+    cmd = ["pyrevit", "run", str(script_path), str(model_path)]
+    # Stream output line by line instead of buffering it all until pyRevit exits.
+    # stderr is merged into stdout so a single reader cannot deadlock on a full pipe.
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1) as proc:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            print(line.rstrip(), flush=True)
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
 
 
-@step("find_latest_json")
 def find_latest_json(folder: Path) -> Path:
     """Pick the most recent JSON file in the output folder.
     This file is the output of the Revit extension"""
@@ -86,13 +76,11 @@ def find_latest_json(folder: Path) -> Path:
     return latest
 
 
-@step("write_pointer_file")
 def write_pointer_file(folder: Path, target: Path) -> None:
     pointer_file = folder / "latest_analytical_json.txt"
     pointer_file.write_text(str(target), encoding="utf-8")
 
 
-@step("write_normalized_output")
 def write_normalized_output(folder: Path, source: Path) -> None:
     """Write output.json with parsed JSON, raise JSONDecodeError on invalid data."""
     output_json_path = folder / "output.json"
@@ -109,19 +97,28 @@ def write_normalized_output(folder: Path, source: Path) -> None:
 def main() -> int:
     ctx = StepErrors()
 
-    model_path = find_local_rvt(_ctx=ctx)
+    model_path: Optional[Path] = None
+    with ctx.step("find_local_rvt"):
+        model_path = find_local_rvt()
     out_dir = OUTPUT_FOLDER.resolve()
-    ensure_output_dir(out_dir, _ctx=ctx)
-    set_out_env(out_dir, _ctx=ctx)
+    with ctx.step("ensure_output_dir"):
+        ensure_output_dir(out_dir)
+    with ctx.step("set_out_env"):
+        set_out_env(out_dir)
 
     if model_path is not None:
-        run_pyrevit(PYREVIT_SCRIPT, model_path, _ctx=ctx)
+        with ctx.step("run_pyrevit"):
+            run_pyrevit(PYREVIT_SCRIPT, model_path)
 
-    latest_json: Optional[Path] = find_latest_json(out_dir, _ctx=ctx)
+    latest_json: Optional[Path] = None
+    with ctx.step("find_latest_json"):
+        latest_json = find_latest_json(out_dir)
 
     if latest_json is not None:
-        write_pointer_file(out_dir, latest_json, _ctx=ctx)
-        write_normalized_output(out_dir, latest_json, _ctx=ctx)
+        with ctx.step("write_pointer_file"):
+            write_pointer_file(out_dir, latest_json)
+        with ctx.step("write_normalized_output"):
+            write_normalized_output(out_dir, latest_json)
 
     # Raise one group if any step failed
     ctx.reraise()
@@ -3,46 +3,39 @@ from __future__ import annotations
 import os
 from pathlib import Path
 import shutil
-from typing import Callable, Optional, Any
-from functools import wraps
+import subprocess
+from typing import Iterator, Optional
+from contextlib import contextmanager
 
 class StepErrors:
 	def __init__(self) -> None:
 		# keep a list of Exception (not BaseException) to satisfy type checkers
 		self.errors: list[Exception] = []
 
+	@contextmanager
+	def step(self, label: str) -> Iterator[None]:
+		"""Collect any exception raised inside the block into self.errors.
+
+		Usage: ``with ctx.step("label"): value = fn()``. On failure the block is
+		abandoned, so callers should pre-assign anything they read afterwards.
+		"""
+		try:
+			yield
+		except BaseException as e:
+			try:
+				e.add_note(f"step={label}")
+			except Exception:
+				pass
+			# convert BaseException to Exception for consistent storage
+			if isinstance(e, Exception):
+				self.errors.append(e)
+			else:
+				self.errors.append(Exception(str(e)))
+
 	def reraise(self) -> None:
 		if self.errors:
 			raise ExceptionGroup("one or more steps failed", self.errors)
 
-
-def step(label: str) -> Callable[[Callable[..., Any]], Callable[..., Optional[Any]]]:
-	"""Decorator that collects exceptions into ctx.errors and returns None on failure.
-
-	The wrapped function must be called with keyword argument _ctx=StepErrors.
-	"""
-	def decorator(fn: Callable[..., Any]) -> Callable[..., Optional[Any]]:
-		@wraps(fn)
-		def wrapped(*args: Any, **kwargs: Any) -> Optional[Any]:
-			ctx = kwargs.pop("_ctx", None)
-			if not isinstance(ctx, StepErrors):
-				raise RuntimeError(f"{fn.__name__} requires _ctx=StepErrors")
-			try:
-				return fn(*args, **kwargs)
-			except BaseException as e:
-				try:
-					e.add_note(f"step={label}")
-				except Exception:
-					pass
-				# convert BaseException to Exception for consistent storage
-				if isinstance(e, Exception):
-					ctx.errors.append(e)
-				else:
-					ctx.errors.append(Exception(str(e)))
-				return None
-		return wrapped
-	return decorator
-
 PYREVIT_SCRIPT: Path = Path(os.environ["APPDATA"]) / "pyRevit-Master" / "extensions" / "PullAnalyticalModel.extension" / "PullAnalyticalModel.tab" / "Exports.panel" / "UpdateModelFeatures.pushbutton" / "script.py"
 
 
@@ -67,7 +60,6 @@ def debugListFiles(base: Path, label: str) -> None:
 		print(f"[revit_worker_edit][debug] Could not list files: {e}", flush=True)
 
 
-@step("find_input_json")
 def findSingleInputJson(base: Path) -> Path:
 	p = base / "input.json"
 	if not p.exists():
@@ -75,7 +67,6 @@ def findSingleInputJson(base: Path) -> Path:
 	return p.resolve()
 
 
-@step("find_model_file")
 def findModelFile(base: Path) -> Path:
 	rvts = sorted(base.glob("*.rvt"))
 	if not rvts:
@@ -85,7 +76,6 @@ def findModelFile(base: Path) -> Path:
 	return rvts[0].resolve()
 
 
-@step("set_env_and_snapshot")
 def setEnvAndSnapshot(script_dir: Path, input_json: Path) -> dict[str, float]:
 	"""Set environment variables required by the pyRevit script and snapshot RVT mtimes."""
 	os.environ["REVIT_ANALYTICAL_UPDATE_JSON"] = str(input_json)
@@ -98,17 +88,16 @@ def setEnvAndSnapshot(script_dir: Path, input_json: Path) -> dict[str, float]:
 	return before_snapshot
 
 
-@step("run_pyrevit")
 def runPyrevit(script_path: str, model_path: Path) -> int:
-	command = f'pyrevit run "{script_path}" "{model_path}"'
-	print(f"[revit_worker_edit] Running: {command}")
-	exit_code = os.system(command)
+	command = ["pyrevit", "run", str(script_path), str(model_path)]
+	print(f"[revit_worker_edit] Running: {subprocess.list2cmdline(command)}")
+	# No shell: arguments are passed as-is and output goes straight to our stdout.
+	exit_code = subprocess.run(command, check=False).returncode
 	if exit_code != 0:
 		print(f"[revit_worker_edit] pyRevit command exited with code {exit_code}")
 	return exit_code
 
 
-@step("select_and_copy_updated")
 def selectAndCopyUpdated(before_snapshot: dict[str, float], script_dir: Path) -> None:
 	newest = selectNewestRvt(before_snapshot, script_dir)
 	target = script_dir / UPDATED_OUTPUT_NAME
@@ -142,26 +131,31 @@ def main() -> int:
 
 	ctx = StepErrors()
 
-	input_json = findSingleInputJson(script_dir, _ctx=ctx)
-	model_path = findModelFile(script_dir, _ctx=ctx)
+	input_json: Optional[Path] = None
+	model_path: Optional[Path] = None
+	with ctx.step("find_input_json"):
+		input_json = findSingleInputJson(script_dir)
+	with ctx.step("find_model_file"):
+		model_path = findModelFile(script_dir)
 
-	before_snapshot = None
+	before_snapshot: Optional[dict[str, float]] = None
 	if input_json is not None:
-		before_snapshot = setEnvAndSnapshot(script_dir, input_json, _ctx=ctx)
+		with ctx.step("set_env_and_snapshot"):
+			before_snapshot = setEnvAndSnapshot(script_dir, input_json)
 
 	debugListFiles(script_dir, "before run")
 
 	exit_code = 0
 	if model_path is not None:
-		res = runPyrevit(PYREVIT_SCRIPT, model_path, _ctx=ctx)
-		if isinstance(res, int):
-			exit_code = res
+		with ctx.step("run_pyrevit"):
+			exit_code = runPyrevit(PYREVIT_SCRIPT, model_path)
 
 	debugListFiles(script_dir, "after run")
 
 	# Attempt to select & copy updated model even if pyRevit returned non-zero
 	if before_snapshot is not None:
-		selectAndCopyUpdated(before_snapshot, script_dir, _ctx=ctx)
+		with ctx.step("select_and_copy_updated"):
+			selectAndCopyUpdated(before_snapshot, script_dir)
 
 	# Raise one group if any step failed
 	ctx.reraise()
@@ -1,19 +1,42 @@
+import gc
+import os
 import subprocess
+from collections import Counter
 import time
 import json 
 import comtypes.client
 
 from pythoncom import CoInitialize, CoUninitialize
 from datetime import datetime
+from functools import partial
+from itertools import chain
+from math import inf
 from pathlib import Path
 
 
 import ctypes
-from comtypes import automation
+from comtypes import COMError, automation
 from comtypes.automation import VT_R8
 
 
-from typing import Annotated, TypedDict, Literal, Any
+from typing import Annotated, TypedDict, Literal, Any, Callable, Iterable
+
+# orjson is optional on the STAAD worker (README only requires comtypes/pywin32).
+# Output is compact: only the controller reads it back.
+try:
+    import orjson
+
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
 
 
 def make_variant_vt_ref(obj: Any, var_type: int) -> automation.VARIANT:
@@ -56,32 +79,42 @@ class CrossSectionInfo(TypedDict):
 
 
 SecNameToIDLookUp = dict[Annotated[str, "CS Name"], Annotated[int, "CS STADD ID"]]
+CsIdToPropNo = dict[Annotated[int, "Cross section id"], Annotated[int, "CS STADD ID"]]
 # Since json doesnt allow int as keys we get str as keys!
 CrossSectionsDict = dict[str, CrossSectionInfo]
 MembersDict = dict[str, MemberInfo]
 
 
-def get_max_section_displacement(
-    openstaad: Annotated[Any, 'OpenSTAADOutput instance.'],
-    member_id: Annotated[int, 'Member identifier.'],
-    load_case: Annotated[int, 'Load case identifier.'],
-    direction: Annotated[str, 'Global direction "X", "Y", "Z"']
-) -> tuple[float, float]:
-    """Backward-compatible helper that calls the OpenSTAAD Output.GetMaxSectionDisplacement API.
+def poll_until(
+    probe: Callable[[], Any],
+    timeout: float,
+    what: str,
+    interval: float = 0.25,
+) -> Any:
+    """Call `probe` every `interval` seconds until it stops raising COM/OS errors.
+
+    Returns the probe's result; raises TimeoutError once `timeout` seconds have passed.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return probe()
+        except (OSError, COMError) as e:
+            if time.monotonic() + interval > deadline:
+                raise TimeoutError(f"{what} not ready after {timeout:.0f}s") from e
+        time.sleep(interval)
+
+
+def bind_dispatch_method(obj: Any, name: str) -> Callable[..., Any]:
+    """Resolve `name` on a dynamic dispatch wrapper once and return a direct Invoke caller.
 
-    Returns (max_disp, max_disp_position).
+    The DISPID is looked up a single time; calls then go straight to IDispatch::Invoke
+    without the wrapper's attribute lookup. Only for methods returning plain values.
     """
-    output = openstaad.Output
-    max_disp = ctypes.c_double()
-    max_disp_pos = ctypes.c_double()
-    output._FlagAsMethod("GetMaxSectionDisplacement")
-    variant_max_disp = make_variant_vt_ref(max_disp, VT_R8)
-    variant_max_disp_pos = make_variant_vt_ref(max_disp_pos, VT_R8)
-    # Map numeric direction to STAAD axis letter
-    output.GetMaxSectionDisplacement(member_id, direction, load_case, variant_max_disp, variant_max_disp_pos)
-    # By default staaad return the values in inch
-    max_disp_value_mm = max_disp.value*25.4
-    return max_disp_value_mm, max_disp_pos.value
+    itf = obj._comobj
+    dispid = itf.GetIDsOfNames(name)[0]
+    return partial(itf.Invoke, dispid, _invkind=automation.DISPATCH_METHOD)
+
 
 def saelect_optimal_section():
     # for each iteration get al get_min_max
@@ -89,40 +122,86 @@ def saelect_optimal_section():
     # return the optimal cross section to viktor
     return None
 
-def create_members_cross_section(staad_property:Any, membes_dict: MembersDict, cs_dict: CrossSectionsDict) -> SecNameToIDLookUp:
-    """Backward-compatible helper that creates beam properties in OpenSTAAD and returns a name->property-id map."""
+def create_members_cross_section(
+    staad_property: Any,
+    membes_dict: MembersDict,
+    cs_dict: CrossSectionsDict,
+    sect_name_id: SecNameToIDLookUp | None = None,
+) -> tuple[SecNameToIDLookUp, CsIdToPropNo]:
+    """Create one beam property per cross-section in use.
+
+    `sect_name_id` is a name->property-id cache shared across calls; names already in it
+    are not created again. Returns that map and a cross_section_id->property-id map.
+    """
     country_code = 3  # UK database.
     type_spec = 0      # ST (Single Section from Table).
     add_spec_1 = 0.0
     add_spec_2 = 0.0
-    unique_cs = set()
-    sect_name_id: SecNameToIDLookUp = {}
-    for _, vals in membes_dict.items():
-        cs_id = vals["cross_section_id"]
-        cs_info = cs_dict[str(cs_id)]
-        cs_name = cs_info["name"]
-        if cs_name not in unique_cs:
+    id_to_name = {int(k): v["name"] for k, v in cs_dict.items()}
+    if sect_name_id is None:
+        sect_name_id = {}
+    id_to_prop: CsIdToPropNo = {}
+    # Unique ids in first-use order, so property numbering matches the member order
+    for cs_id in dict.fromkeys(vals["cross_section_id"] for vals in membes_dict.values()):
+        cs_name = id_to_name[cs_id]
+        property_no = sect_name_id.get(cs_name)
+        if property_no is None:
             property_no = staad_property.CreateBeamPropertyFromTable(
                 country_code, cs_name, type_spec, add_spec_1, add_spec_2
             )
-            unique_cs.add(cs_name)
             sect_name_id[cs_name] = property_no
-    return sect_name_id
+        id_to_prop[cs_id] = property_no
+    return sect_name_id, id_to_prop
 
 member_displacements = dict[Annotated[int, "Member id"], Annotated[float, "Member max displacement Y dir"]]
 
+# Nodes are created as (x, z, y), so the model's vertical (Revit z) is STAAD's global Y
+VERTICAL_AXIS = "Y"
 
-def get_members_z_displacements(openstaad: Any, members_dict: MembersDict, case_num:int) -> dict:
-    member_dispacement: member_displacements = {}
-    for member_id in members_dict:
-        max_disp, _ = get_max_section_displacement(
-            openstaad=openstaad,
-            member_id=int(member_id),
-            load_case=case_num,
-            direction="Y",
-        )
-        member_dispacement[int(member_id)] = max_disp
-    return member_dispacement
+
+class _DispProbe:
+    """GetMaxSectionDisplacement caller owning one pair of by-ref out-params.
+
+    Created once per STAADModel; every probe reuses the same c_double/VARIANT objects.
+    """
+
+    def __init__(self, get_max_disp: Annotated[Callable[..., Any], 'Bound Output.GetMaxSectionDisplacement.']) -> None:
+        self._get_max_disp = get_max_disp
+        self._d = ctypes.c_double()
+        self._p = ctypes.c_double()
+        self._vd = make_variant_vt_ref(self._d, VT_R8)
+        self._vp = make_variant_vt_ref(self._p, VT_R8)
+
+    def probe(self, member_id: int, load_case: int, direction: str) -> tuple[float, float]:
+        """Returns (max_disp_mm, max_disp_position) of one member."""
+        self._get_max_disp(member_id, direction, load_case, self._vd, self._vp)
+        # By default staaad return the values in inch
+        return self._d.value*25.4, self._p.value
+
+    def sweep(
+        self,
+        member_ids: Iterable[int],
+        load_case: int,
+        limit: float = inf,
+        direction: str = VERTICAL_AXIS,
+    ) -> tuple[member_displacements, list[int]]:
+        """Max displacement (mm) of every member, keyed by int member id.
+
+        Returns (displacements, ids of members whose |displacement| exceeds `limit`).
+        """
+        # Kept serial on purpose: STAAD serves OpenSTAAD from its single UI apartment, so calls
+        # marshalled in from worker threads queue behind each other and add proxy overhead.
+        # Same call as probe(), inlined with locals only inside the loop
+        get_max_disp, d, vd, vp = self._get_max_disp, self._d, self._vd, self._vp
+        out: member_displacements = {}
+        over: list[int] = []
+        for mid in member_ids:
+            get_max_disp(mid, direction, load_case, vd, vp)
+            disp = d.value*25.4
+            out[mid] = disp
+            if abs(disp) > limit:
+                over.append(mid)
+        return out, over
 
 
 class STAADModel:
@@ -131,6 +210,18 @@ class STAADModel:
     Methods are atomic so callers can run individual steps or the full workflow.
     """
 
+    # OpenSTAAD methods called by this class, per sub-interface ("" is the root object).
+    # _flag_methods flags them once at connect time; nothing else calls _FlagAsMethod.
+    _COM_METHODS: dict[str, tuple[str, ...]] = {
+        "": ("Analyze", "isAnalyzing", "SetSilentMode", "GetBaseUnit", "SaveModel", "NewSTAADFile"),
+        "Output": ("GetMaxSectionDisplacement",),
+        "Geometry": ("CreateNode", "CreateBeam"),
+        "Property": ("SetMaterialName", "CreateBeamPropertyFromTable", "AssignBeamProperty"),
+        "Support": ("CreateSupportFixed", "AssignSupportToNode"),
+        "Load": ("SetLoadActive", "CreateNewPrimaryLoad", "AddSelfWeightInXYZ", "AddNodalLoad"),
+        "Command": ("PerformAnalysis",),
+    }
+
     def __init__(
         self,
         nodes: NodesDict,
@@ -139,39 +230,132 @@ class STAADModel:
         sections: CrossSectionsDict,
         staad_path: str | None = None,
         material_name: str = "STEEL",
+        supports: list[int] | None = None,
     ) -> None:
         self.nodes = nodes
         self.lines = lines
         self.members = members
         self.sections = sections
+        # First id per name wins, as the old linear scan did
+        self._name_to_sid: dict[str, int] = {}
+        for sid, info in sections.items():
+            self._name_to_sid.setdefault(info["name"], int(sid))
+        # Next free section id for _add_dummy_section
+        self._next_sid: int = max(map(int, sections), default=0) + 1
         self.current_member_displacement: member_displacements = {}
+        # Normalise once so lookups below never need int()/str() per access
+        for vals in members.values():
+            vals["cross_section_id"] = int(vals["cross_section_id"])
+        # int-keyed views over the same info dicts (JSON forces str keys on the originals)
+        self._members_by_int: dict[int, MemberInfo] = {int(k): v for k, v in members.items()}
+        self._member_ids: list[int] = list(self._members_by_int)
+        self._sections_by_int: dict[int, CrossSectionInfo] = {int(k): v for k, v in sections.items()}
+        # Flat per-node / per-line columns parsed once; the COM loops only index into these
+        self._node_ids: list[int] = [int(nid) for nid in nodes]
+        self._node_xyz: list[tuple[float, float, float]] = [(n["x"], n["y"], n["z"]) for n in nodes.values()]
+        self._node_row: dict[int, int] = {nid: row for row, nid in enumerate(self._node_ids)}
+        self._line_keys: list[str] = list(lines)
+        self._line_ids: list[int] = [int(lid) for lid in lines]
+        self._line_ni: list[int] = [int(vals["Ni"]) for vals in lines.values()]
+        self._line_nj: list[int] = [int(vals["Nj"]) for vals in lines.values()]
         self.staad_path = (
             staad_path
             or r"C:\Program Files\Bentley\Engineering\STAAD.Pro 2025\STAAD\Bentley.Staad.exe"
         )
         self.material_name = material_name
+        # Fixed-support node ids; None means "every node at the lowest z"
+        self.supports = supports
+        node_z = [xyz[2] for xyz in self._node_xyz]
+        if supports is not None:
+            self._support_nodes: list[int] = [int(node_id) for node_id in supports]
+        else:
+            min_z = min(node_z)
+            self._support_nodes = [nid for nid, z in zip(self._node_ids, node_z) if z == min_z]
+        # Point loads go on every node above ground level (z != 0)
+        self._loaded_nodes: list[int] = [nid for nid, z in zip(self._node_ids, node_z) if z != 0]
         self.openstaad: Any | None = None
+        # OpenSTAAD sub-interfaces, fetched and flagged once by _flag_methods()
+        self._output: Any | None = None
+        self._geometry: Any | None = None
+        self._property: Any | None = None
+        self._load: Any | None = None
+        self._support: Any | None = None
+        self._command: Any | None = None
+        # Direct Invoke callers for the per-line hot methods (see bind_dispatch_method)
+        self._invoke: dict[str, Callable[..., Any]] = {}
+        self._disp_probe: _DispProbe | None = None
+        # Section name -> STAAD property number of every table property created so far
+        self._sect_name_id: SecNameToIDLookUp = {}
+        # Entities already present on the STAAD side
+        self._created_nodes: set[int] = set()
+        self._created_beams: set[int] = set()
         self.staad_process: subprocess.Popen | None = None
+        self._com_initialized = False
         self.case_num: int | None = None
+        # PERFORM ANALYSIS is written into each .std file once; later runs only save and analyse
+        self._analysis_command_added = False
+
+    def launch_and_connect(self, timeout: float = 120.0, reuse_running: bool = False) -> None:
+        """Start STAAD.Pro and connect to OpenSTAAD COM object as soon as it registers.
 
-    def launch_and_connect(self) -> None:
-        """Start STAAD.Pro and connect to OpenSTAAD COM object."""
+        With `reuse_running`, an already running STAAD.Pro is attached to instead, skipping
+        the cold start; close() leaves an instance it did not spawn running. new_staad_file()
+        then opens the new model inside that session, replacing whatever file it had open.
+        """
         CoInitialize()
-        self.staad_process = subprocess.Popen([self.staad_path])
-        time.sleep(15)
-        self.openstaad = comtypes.client.GetActiveObject("StaadPro.OpenSTAAD")
-        # Ensure a few commonly-used members are flagged as methods so comtypes exposes them callable
-        if self.openstaad:
-            self.openstaad._FlagAsMethod("Analyze")
-            self.openstaad._FlagAsMethod("isAnalyzing")
-            self.openstaad._FlagAsMethod("SetSilentMode")
-        else:
+        self._com_initialized = True
+        if reuse_running:
+            try:
+                self.openstaad = comtypes.client.GetActiveObject("StaadPro.OpenSTAAD")
+            except (OSError, COMError):
+                self.openstaad = None
+        if self.openstaad is None:
+            self.staad_process = subprocess.Popen([self.staad_path])
+            self.openstaad = poll_until(self._connect_probe, timeout, "OpenSTAAD")
+        if not self.openstaad:
             raise Exception("Couldn't open STAAD")
-        time.sleep(5)
+        self._flag_methods()
+
+    def _connect_probe(self) -> Any:
+        """One GetActiveObject attempt; fails fast if the spawned STAAD already exited."""
+        assert self.staad_process is not None
+        exit_code = self.staad_process.poll()
+        if exit_code is not None:
+            raise RuntimeError(f"STAAD.Pro exited with code {exit_code} before OpenSTAAD registered")
+        return comtypes.client.GetActiveObject("StaadPro.OpenSTAAD")
+
+    def _flag_methods(self) -> None:
+        """Fetch the OpenSTAAD sub-interfaces once and flag every method this class calls.
+
+        Each ``openstaad.Output``/``.Property``/... access returns a fresh dispatch wrapper
+        with an empty method table, so the flagged wrappers are kept and reused.
+        """
+        openstaad = self.openstaad
+        assert openstaad is not None
+        for attr, names in self._COM_METHODS.items():
+            obj = getattr(openstaad, attr) if attr else openstaad
+            self._flag(obj, *names)
+            if attr:
+                # Kept as self._output, self._geometry, ...
+                setattr(self, f"_{attr.lower()}", obj)
+        self._disp_probe = _DispProbe(bind_dispatch_method(self._output, "GetMaxSectionDisplacement"))
+        self._invoke = {
+            "CreateNode": bind_dispatch_method(self._geometry, "CreateNode"),
+            "CreateBeam": bind_dispatch_method(self._geometry, "CreateBeam"),
+            "AssignBeamProperty": bind_dispatch_method(self._property, "AssignBeamProperty"),
+        }
+
+    def _flag(self, obj: Any, *names: str) -> Any:
+        """Flag `names` as methods on a dispatch wrapper; returns the wrapper.
 
+        Always flags: _FlagAsMethod is idempotent, and every sub-interface access returns a
+        new wrapper anyway.
+        """
+        obj._FlagAsMethod(*names)
+        return obj
 
-    def new_staad_file(self, std_file_path: Path | None = None) -> Path:
-        """Create a new STAAD file on disk and return its path."""
+    def new_staad_file(self, std_file_path: Path | None = None, timeout: float = 60.0) -> Path:
+        """Create a new STAAD file on disk and return its path once STAAD has loaded it."""
         now = datetime.now()
         timestamp = now.strftime("%Y-%m-%d_%H-%M")
         std_file_path = std_file_path or (Path.cwd() / f"Structure_{timestamp}.std")
@@ -179,67 +363,79 @@ class STAADModel:
         force_unit = 5  # Kilo Newton
         assert self.openstaad is not None
         self.openstaad.NewSTAADFile(str(std_file_path), length_unit, force_unit)
-        time.sleep(5)
+        # Property numbers, nodes, beams and the analysis command all belong to the previous .std file
+        self._sect_name_id.clear()
+        self._created_nodes.clear()
+        self._created_beams.clear()
+        self._analysis_command_added = False
+        # GetBaseUnit only answers once the new file is open
+        poll_until(self.openstaad.GetBaseUnit, timeout, "STAAD file")
         return std_file_path
 
     def set_material_name(self, material_name: str) -> None:
-        assert self.openstaad is not None
-        staad_property = self.openstaad.Property
-        staad_property._FlagAsMethod("SetMaterialName")
-        staad_property.SetMaterialName(material_name)
+        assert self._property is not None
+        self._property.SetMaterialName(material_name)
 
-    def create_members_cross_section(self) -> SecNameToIDLookUp:
-        assert self.openstaad is not None
-        staad_property = self.openstaad.Property
-        staad_property._FlagAsMethod("CreateBeamPropertyFromTable")
-        return create_members_cross_section(staad_property, self.members, self.sections)
+    def create_members_cross_section(self) -> tuple[SecNameToIDLookUp, CsIdToPropNo]:
+        assert self._property is not None
+        return create_members_cross_section(self._property, self.members, self.sections, self._sect_name_id)
 
     def create_nodes_and_beams(self) -> None:
-        """Create nodes and beam elements from the provided dictionaries and assign properties."""
-        assert self.openstaad is not None
-        geometry = self.openstaad.Geometry
-        geometry._FlagAsMethod("CreateNode")
-        geometry._FlagAsMethod("CreateBeam")
-        staad_property = self.openstaad.Property
-        staad_property._FlagAsMethod("AssignBeamProperty")
-
-        cs_name2id_lookup = self.create_members_cross_section()
-
-        created_nodes: set[str] = set()
-        for line_id, vals in self.lines.items():
-            Ni_id = str(vals["Ni"])
-            Nj_id = str(vals["Nj"])
-            Ni_cords = self.nodes[Ni_id]
-            Nj_cords = self.nodes[Nj_id]
-            if Ni_id not in created_nodes:
-                # NOTE: original order was (id, x, z, y)
-                geometry.CreateNode(int(Ni_id), Ni_cords["x"], Ni_cords["z"], Ni_cords["y"])
-                created_nodes.add(Ni_id)
-            if Nj_id not in created_nodes:
-                geometry.CreateNode(int(Nj_id), Nj_cords["x"], Nj_cords["z"], Nj_cords["y"])
-                created_nodes.add(Nj_id)
-            geometry.CreateBeam(int(line_id), Ni_id, Nj_id)
-            member_props = self.members[line_id]
-            cs_info = self.sections[str(member_props["cross_section_id"]) ]
-            staad_property.AssignBeamProperty(int(line_id), cs_name2id_lookup[cs_info["name"]])
+        """Create nodes and beam elements from the provided dictionaries and assign properties.
+
+        Nodes and beams already created by an earlier call are skipped; properties are
+        (re)assigned for every beam, so repeated calls only sync cross-sections.
+        """
+        assert self._invoke, "launch_and_connect() binds the OpenSTAAD methods"
+
+        _, id_to_prop = self.create_members_cross_section()
+
+        members = self.members
+        # Aligned with the line columns; lines and members share keys
+        line_props = [id_to_prop[members[key]["cross_section_id"]] for key in self._line_keys]
+
+        create_node = self._invoke["CreateNode"]
+        create_beam = self._invoke["CreateBeam"]
+        assign_beam_property = self._invoke["AssignBeamProperty"]
+        node_xyz, node_row = self._node_xyz, self._node_row
+        created_nodes, created_beams = self._created_nodes, self._created_beams
+        # Every line end once, in first-seen order
+        for nid in dict.fromkeys(chain.from_iterable(zip(self._line_ni, self._line_nj))):
+            if nid in created_nodes:
+                continue
+            x, y, z = node_xyz[node_row[nid]]
+            # NOTE: original order was (id, x, z, y)
+            create_node(nid, x, z, y)
+            created_nodes.add(nid)
+        for beam_no, ni, nj, property_no in zip(self._line_ids, self._line_ni, self._line_nj, line_props):
+            if beam_no not in created_beams:
+                create_beam(beam_no, ni, nj)
+                created_beams.add(beam_no)
+            assign_beam_property(beam_no, property_no)
+
+    def reassign_member_property(self, member_id: int, section_name: str) -> int:
+        """Point an existing beam at table section `section_name`; returns the property number.
+
+        The property is created on first use only, so geometry never has to be rebuilt.
+        """
+        property_no = self._sect_name_id.get(section_name)
+        if property_no is None:
+            assert self._property is not None
+            property_no = self._property.CreateBeamPropertyFromTable(3, section_name, 0, 0.0, 0.0)
+            self._sect_name_id[section_name] = property_no
+        self._invoke["AssignBeamProperty"](member_id, property_no)
+        return property_no
 
     def add_support(self) -> None:
-        assert self.openstaad is not None
-        support = self.openstaad.Support
-        support._FlagAsMethod("CreateSupportFixed")
-        support._FlagAsMethod("AssignSupportToNode")
+        support = self._support
+        assert support is not None
         varnSupportNo = support.CreateSupportFixed()
-        min_z = min([vals["z"] for vals in self.nodes.values()])
-        for node_id, vals in self.nodes.items():
-            if vals["z"] == min_z:
-                support.AssignSupportToNode(int(node_id), varnSupportNo)
+        for node_id in self._support_nodes:
+            support.AssignSupportToNode(node_id, varnSupportNo)
 
     def create_load_case(self) -> int:
-        assert self.openstaad is not None
-        load = self.openstaad.Load
-        load._FlagAsMethod("SetLoadActive")
-        load._FlagAsMethod("CreateNewPrimaryLoad")
-        load._FlagAsMethod("AddSelfWeightInXYZ")
+        load = self._load
+        assert load is not None
         case_num = load.CreateNewPrimaryLoad("Self Weight")
         ret = load.SetLoadActive(case_num)
         _ = load.AddSelfWeightInXYZ(2, -1.0)
@@ -247,59 +443,107 @@ class STAADModel:
         return case_num
 
     def create_point_loads(self, case_num: int, load_mag: float) -> None:
-        load = self.openstaad.Load
-        load._FlagAsMethod("AddNodalLoad")
-        load._FlagAsMethod("SetLoadActive")
+        load = self._load
+        assert load is not None
         ret = load.SetLoadActive(case_num) 
-        for node_id, args in self.nodes.items():
-            if args["z"] != 0:
-                load.AddNodalLoad(int(node_id), 0, -load_mag, 0, 0, 0, 0)
+        for node_id in self._loaded_nodes:
+            load.AddNodalLoad(node_id, 0, -load_mag, 0, 0, 0, 0)
 
-    def run_analysis(self, silent: bool = True, wait: bool = True) -> int:
-        assert self.openstaad is not None
-        command = self.openstaad.Command
-        command._FlagAsMethod("PerformAnalysis")
+    def run_analysis(
+        self,
+        silent: bool = True,
+        wait: bool = True,
+        timeout: float = 600.0,
+        poll_interval: float = 0.1,
+    ) -> int:
+        assert self.openstaad is not None and self._command is not None
         if silent:
-            self.openstaad._FlagAsMethod("SetSilentMode")
             self.openstaad.SetSilentMode(1)
-        command.PerformAnalysis(6)
+        if not self._analysis_command_added:
+            self._command.PerformAnalysis(6)
+            self._analysis_command_added = True
         self.openstaad.SaveModel(1)
         # Trigger analysis and optionally wait
-        # Flagging is done during connect; call Analyze and poll isAnalyzing() as a method
+        # Flagging is done once in _flag_methods; call Analyze and poll isAnalyzing() as a method
         self.openstaad.Analyze()
         if wait:
+            # OpenSTAAD exposes no completion event, so poll; the deadline stops a hung
+            # analysis from blocking the worker forever.
+            deadline = time.monotonic() + timeout
             while self.openstaad.isAnalyzing():
-                time.sleep(2)
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"STAAD analysis still running after {timeout:.0f}s")
+                time.sleep(poll_interval)
         return 0
 
     def get_member_max_displacement(self, member_id: int, load_case: int, direction: str) -> tuple[float, float]:
-        assert self.openstaad is not None
-        return get_max_section_displacement(self.openstaad, member_id, load_case, direction)
+        assert self._disp_probe is not None
+        return self._disp_probe.probe(member_id, load_case, direction)
 
     def get_member_max_displacements(self, load_case: int) -> member_displacements:
-        assert self.openstaad is not None
-        out: member_displacements = {}
-        for member_id in self.members:
-            max_disp, _ = self.get_member_max_displacement(int(member_id), load_case, direction="Y")
-            out[int(member_id)] = max_disp
+        assert self._disp_probe is not None
+        out, _ = self._disp_probe.sweep(self._member_ids, load_case)
         self.current_member_displacement = out
         return out
 
+    def get_non_compliant_members(self, load_case: int, allowable_disp: float) -> list[int]:
+        """Ids of members whose max displacement (mm) exceeds `allowable_disp`.
+
+        Reads and checks every member in one sweep; the displacements are kept in
+        current_member_displacement.
+        """
+        assert self._disp_probe is not None
+        out, over = self._disp_probe.sweep(self._member_ids, load_case, allowable_disp)
+        self.current_member_displacement = out
+        return over
+
+    def close(self, grace: float = 3.0) -> None:
+        """Release every OpenSTAAD proxy, stop the spawned STAAD.Pro and uninitialise COM.
+
+        Proxies are dropped first so no interface is still referenced when COM shuts down;
+        STAAD gets `grace` seconds to exit after terminate() before it is killed.
+        """
+        self._disp_probe = None
+        self._invoke = {}
+        self._output = None
+        self._property = None
+        self._geometry = None
+        self._load = None
+        self._support = None
+        self._command = None
+        self.openstaad = None
+        # Collect now so every comtypes proxy runs its Release before CoUninitialize
+        gc.collect()
+        process = self.staad_process
+        if process is not None and process.poll() is None:
+            try:
+                process.terminate()
+                try:
+                    process.wait(timeout=grace)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait(timeout=grace)
+            except Exception as e:
+                print(f"Failed to terminate STAAD process: {e}")
+        self.staad_process = None
+        if self._com_initialized:
+            CoUninitialize()
+            self._com_initialized = False
+
+    def __enter__(self) -> "STAADModel":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
     def _find_section_id_by_name(self, section_name: str) -> int | None:
         """Return existing section id (int) for given section name or None."""
-        for sid_str, info in self.sections.items():
-            if info.get("name") == section_name:
-                try:
-                    return int(sid_str)
-                except Exception:
-                    continue
-        return None
+        return self._name_to_sid.get(section_name)
 
     def _add_dummy_section(self, section_name: str) -> int:
         """Add a CrossSectionInfo with dummy numeric attributes and return its new int id."""
-        # choose new id as max existing + 1
-        existing_ids = [int(k) for k in self.sections.keys()] if self.sections else []
-        new_id = max(existing_ids) + 1 if existing_ids else 1
+        new_id = self._next_sid
+        self._next_sid += 1
         info: CrossSectionInfo = {
             "name": section_name,
             "id": new_id,
@@ -311,89 +555,80 @@ class STAADModel:
             "h": 0.2,
         }
         self.sections[str(new_id)] = info
+        self._sections_by_int[new_id] = info
+        self._name_to_sid[section_name] = new_id
         return new_id
 
 
 def run_staad():
     input_json = Path.cwd() / "STAAD_inputs.json"
-    with open(input_json) as jsonfile:
-        loaded = json.load(jsonfile)
-
-    # Expecting a JSON array: [nodes, lines, section_name, member_dict, cross_section_dict]
-    nodes, lines, section_name, member_dict, cross_section_dict, allowable_disp, load_mag = loaded
-
-    # Create STAAD model wrapper and run end-to-end
-    model = STAADModel(nodes=nodes, lines=lines, members=member_dict, sections=cross_section_dict)
-    model.launch_and_connect()
-    model.new_staad_file(std_file_path=None)
-    model.set_material_name("STEEL")
-    model.create_nodes_and_beams()
-    # Hard-coded supports from previous script (kept for compatibility)
-    model.add_support()
-    num_case = model.create_load_case()
-    candidate_sections = [
-        "UB254x102x28",
-        "UB406x178x60",
-        "UB533x210x92",
-        "UB610x229x125",
-        "UB1016x305x494",
-
-    ]
-    model.create_point_loads(case_num=num_case, load_mag=load_mag)
-    model.run_analysis()
-    member_displacement: dict[int, float] = {}
-    for member_id in member_dict:
-        max_disp, _ = model.get_member_max_displacement(member_id=member_id, load_case=num_case, direction="Y")
-        member_displacement[member_id] = max_disp
-
-    non_compliant_member = [member_id for member_id, disp in member_displacement.items() if abs(disp) > allowable_disp]
-
-    def find_next_section(current_name: str, candidates: list[str]) -> str | None:
-        try:
-            idx = candidates.index(current_name)
-            if idx + 1 < len(candidates):
-                return candidates[idx + 1]
-        except ValueError:
-            if candidates:
-                return candidates[0]
-        return None
-
-    while non_compliant_member:
-        staad_property = model.openstaad.Property
-        staad_property._FlagAsMethod("CreateBeamPropertyFromTable")
-        staad_property._FlagAsMethod("AssignBeamProperty")
-        for member_id in non_compliant_member:
-            current_cs_id = member_dict[member_id]["cross_section_id"]
-            current_cs_info = cross_section_dict[str(current_cs_id)]
-            current_name = current_cs_info["name"]
-            next_name = find_next_section(current_name, candidate_sections)
-            if next_name is None:
-                print(f"Member {member_id}: {current_name} has no more candidate sections. Still non-compliant.")
-                continue
-            print(f"Member {member_id}: {current_name} -> {next_name}")
-            next_cs_id = model._find_section_id_by_name(next_name)
-            if next_cs_id is None:
-                staad_property.CreateBeamPropertyFromTable(3, next_name, 0, 0.0, 0.0)
-                next_cs_id = model._add_dummy_section(next_name)
-            member_dict[member_id]["cross_section_id"] = next_cs_id
-            staad_property.AssignBeamProperty(int(member_id), next_cs_id)
-        model.members = member_dict
-        model.sections = cross_section_dict
+    loaded = _loads(input_json.read_bytes())
+
+    # Expecting a JSON array: [nodes, lines, section_name, member_dict, cross_section_dict,
+    # allowable_disp, load_mag] with an optional trailing list of support node ids
+    nodes, lines, section_name, member_dict, cross_section_dict, allowable_disp, load_mag, *extra = loaded
+    supports: list[int] | None = extra[0] if extra else None
+
+    # Create STAAD model wrapper and run end-to-end; leaving the block closes STAAD
+    with STAADModel(
+        nodes=nodes, lines=lines, members=member_dict, sections=cross_section_dict, supports=supports
+    ) as model:
+        # Set on the worker machine: STAAD_REUSE_RUNNING=1 attaches to an open STAAD.Pro
+        model.launch_and_connect(reuse_running=os.environ.get("STAAD_REUSE_RUNNING") == "1")
+        model.new_staad_file(std_file_path=None)
+        model.set_material_name("STEEL")
         model.create_nodes_and_beams()
+        # Supports from the input file, else every node at the lowest level
         model.add_support()
-        if not num_case:
-            num_case = model.create_load_case()
-            model.create_point_loads(case_num=num_case, load_mag=load_mag)
+        num_case = model.create_load_case()
+        candidate_sections = [
+            "UB254x102x28",
+            "UB406x178x60",
+            "UB533x210x92",
+            "UB610x229x125",
+            "UB1016x305x494",
+
+        ]
+        model.create_point_loads(case_num=num_case, load_mag=load_mag)
         model.run_analysis()
-        member_displacement = {}
-        for member_id in member_dict:
-            max_disp, _ = model.get_member_max_displacement(member_id=member_id, load_case=num_case, direction="Y")
-            member_displacement[member_id] = max_disp
-        non_compliant_member = [member_id for member_id, disp in member_displacement.items() if abs(disp) > allowable_disp]
-        # Break if there are still non-compliant members after trying all candidate sections
-        if any(find_next_section(cross_section_dict[str(member_dict[m]["cross_section_id"])] ["name"], candidate_sections) is None for m in non_compliant_member):
-            print("Breaking: Some members remain non-compliant after all candidate sections.")
-            break
+        non_compliant_member = model.get_non_compliant_members(num_case, allowable_disp)
+
+        # Each candidate maps to the next larger one (the largest to None); unknown sections start at the smallest
+        next_of: dict[str, str | None] = dict(zip(candidate_sections, [*candidate_sections[1:], None]))
+        first_candidate = candidate_sections[0] if candidate_sections else None
+
+        def find_next_section(current_name: str) -> str | None:
+            return next_of.get(current_name, first_candidate)
+
+        while non_compliant_member:
+            # One summary line per pass instead of a print per member
+            upgrades: Counter[tuple[str, str]] = Counter()
+            exhausted = 0
+            for member_id in non_compliant_member:
+                member_info = model._members_by_int[member_id]
+                current_name = model._sections_by_int[member_info["cross_section_id"]]["name"]
+                next_name = find_next_section(current_name)
+                if next_name is None:
+                    exhausted += 1
+                    continue
+                upgrades[(current_name, next_name)] += 1
+                next_cs_id = model._find_section_id_by_name(next_name)
+                if next_cs_id is None:
+                    next_cs_id = model._add_dummy_section(next_name)
+                member_info["cross_section_id"] = next_cs_id
+                # Only the changed members are touched; nodes, beams and supports already exist
+                model.reassign_member_property(member_id, next_name)
+            summary = ", ".join(f"{count} x {old} -> {new}" for (old, new), count in upgrades.items())
+            print(f"Resection: {summary or 'no upgrades'}; {exhausted} member(s) without larger candidates")
+            if not upgrades:
+                # Every non-compliant member is already at the largest candidate; re-analysing changes nothing
+                print("Breaking: Some members remain non-compliant after all candidate sections.")
+                break
+            if not num_case:
+                num_case = model.create_load_case()
+                model.create_point_loads(case_num=num_case, load_mag=load_mag)
+            model.run_analysis()
+            non_compliant_member = model.get_non_compliant_members(num_case, allowable_disp)
 
     updated_member_dict = model.members
     updated_sections = model.sections
@@ -402,18 +637,10 @@ def run_staad():
         updated_sections,
     ]
     json_path = Path.cwd() / "STAAD_output.json"
-    with open(json_path, "w", encoding="utf-8") as fh:
-        json.dump(updated_inputs, fh, indent=2)
-
-    # Shutdown STAAD process if it was launched
-    if hasattr(model, 'staad_process') and model.staad_process is not None:
-        try:
-            model.staad_process.terminate()
-            model.staad_process.wait(timeout=10)
-        except Exception as e:
-            print(f"Failed to terminate STAAD process: {e}")
-    openstaad = None
-    CoUninitialize()
+    # Write next to the target and swap in, so a crash never leaves a half-written output
+    tmp_path = json_path.with_suffix(".json.tmp")
+    tmp_path.write_bytes(_dumps(updated_inputs))
+    os.replace(tmp_path, json_path)
     return 0
 
 if __name__ == "__main__":
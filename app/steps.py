@@ -2,6 +2,8 @@ from typing import Callable, Optional, Any
 from functools import wraps
 
 class StepErrors:
+    __slots__ = ("errors",)
+
     def __init__(self) -> None:
         self.errors: list[Exception] = []
 
@@ -18,20 +20,25 @@ def step(label: str) -> Callable[[Callable[..., Any]], Callable[..., Optional[An
 
     The wrapped function must be invoked with _ctx=StepErrors; the wrapped
     function itself does not receive _ctx (it's popped before call).
+    Once _ctx holds an error, later steps are skipped and return None unless
+    called with _force=True (also popped).
     """
+    note = f"step={label}"
+
     def decorator(fn: Callable[..., Any]) -> Callable[..., Optional[Any]]:
         @wraps(fn)
         def wrapped(*args: Any, **kwargs: Any) -> Optional[Any]:
             ctx = kwargs.pop("_ctx", None)
             if not isinstance(ctx, StepErrors):
                 raise RuntimeError(f"{fn.__name__} requires _ctx=StepErrors")
+            force = kwargs.pop("_force", False)
+            if ctx.has_errors() and not force:
+                return None
             try:
                 return fn(*args, **kwargs)
             except BaseException as e:  # noqa: BLE001
-                try:
-                    e.add_note(f"step={label}")  # type: ignore[attr-defined]
-                except Exception:  # pragma: no cover - note add best effort
-                    pass
+                # BaseException.add_note exists on every supported Python (3.11+)
+                e.add_note(note)
                 if isinstance(e, Exception):
                     ctx.errors.append(e)
                 else:
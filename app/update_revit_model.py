@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from io import BytesIO
 from pathlib import Path
 from typing import Iterable
 
@@ -27,12 +26,13 @@ def select_original_rvt(base_dir: Path) -> Path:
     return models[0]
 
 
-@step("read_stage_bytes")
-def read_staged_files(model_path: Path, input_json_path: Path) -> tuple[bytes, bytes]:
-    try:
-        return model_path.read_bytes(), input_json_path.read_bytes()
-    except Exception as e:  # noqa: BLE001
-        raise RuntimeError(f"Failed reading staged files: {e}")
+@step("stage_files")
+def stage_files(model_path: Path, input_json_path: Path) -> tuple[File, File]:
+    """Path-backed Files, so the RVT is streamed to the worker instead of loaded into memory."""
+    for path in (model_path, input_json_path):
+        if not path.is_file():
+            raise FileNotFoundError(f"Staged file missing: {path}")
+    return File.from_path(model_path), File.from_path(input_json_path)
 
 
 @step("prepare_update_worker_script")
@@ -46,13 +46,13 @@ def prepare_update_worker_script(script_dir: Path) -> File:
 def run_update_worker(
     script: File,
     model_name: str,
-    model_bytes: bytes,
-    input_json_bytes: bytes,
+    model_file: File,
+    input_json_file: File,
     timeout: int = 600,
 ) -> bytes:
     files_to_stage = [
-        (model_name, BytesIO(model_bytes)),
-        ("input.json", BytesIO(input_json_bytes))
+        (model_name, model_file),
+        ("input.json", input_json_file),
     ]
     try:
         analysis = PythonAnalysis(
@@ -0,0 +1,145 @@
+"""Box-tree pair search vs. the all-pairs scan it replaced.
+
+Random plan layouts on a coarse grid produce shared endpoints, T-junctions and collinear
+overlaps; a 1e5 offset exercises large model coordinates.
+"""
+import random
+
+import pytest
+
+# app/__init__ imports the controller, which needs viktor
+pytest.importorskip("viktor")
+
+from app.geometry_utils.connecte_intersetc_lines import (  # noqa: E402
+    augmentMappingsWithExistingSegments,
+    boxesOverlap,
+    buildBoxTree,
+    buildChildren,
+    cloneLines,
+    cloneMembers,
+    cloneNodes,
+    connect_lines_at_intersections,
+    findExistingNode,
+    initSplitParams,
+    planBox,
+    queryBoxTree,
+    segmentIntersectionXY,
+)
+
+TOL = 1e-4  # what the controller passes
+
+
+def allPairsCollectIntersections(new_nodes, new_lines, splits_by_line, tol, next_node_id):
+    """collectIntersections as it was before the box tree: every i < j pair is tested."""
+    line_ids = list(new_lines.keys())
+    n_lines = len(line_ids)
+    tol_z = max(tol, 10.0 * tol)
+    for i in range(n_lines):
+        lid_i = line_ids[i]
+        li = new_lines[lid_i]
+        Pi = new_nodes[li["Ni"]]
+        Pj = new_nodes[li["Nj"]]
+        p1 = (Pi["x"], Pi["y"])
+        p2 = (Pj["x"], Pj["y"])
+        zi = (Pi["z"] + Pj["z"]) * 0.5
+        for j in range(i + 1, n_lines):
+            lid_j = line_ids[j]
+            lj = new_lines[lid_j]
+            Qi = new_nodes[lj["Ni"]]
+            Qj = new_nodes[lj["Nj"]]
+            q1 = (Qi["x"], Qi["y"])
+            q2 = (Qj["x"], Qj["y"])
+            zj = (Qi["z"] + Qj["z"]) * 0.5
+            if abs(zi - zj) > tol_z:
+                continue
+            hit = segmentIntersectionXY(p1, p2, q1, q2, tol=tol)
+            if not hit:
+                continue
+            xi, yi, ti, uj = hit
+            zi_use = (zi + zj) * 0.5
+            existing = findExistingNode(new_nodes, xi, yi, zi_use, tol=tol)
+            if existing is None:
+                nid = next_node_id
+                next_node_id += 1
+                new_nodes[nid] = {"id": nid, "x": float(xi), "y": float(yi), "z": float(zi_use)}
+            else:
+                nid = existing
+            splits_by_line[lid_i].append((ti, nid))
+            splits_by_line[lid_j].append((uj, nid))
+    return next_node_id
+
+
+def allPairsConnect(nodes, lines, members, tol):
+    new_nodes = cloneNodes(nodes)
+    new_lines = cloneLines(lines)
+    new_members = cloneMembers(members)
+    splits_by_line = initSplitParams(new_lines)
+    next_node_id = max(new_nodes) + 1 if new_nodes else 1
+    next_line_id = max(new_lines) + 1 if new_lines else 1
+    next_node_id = allPairsCollectIntersections(new_nodes, new_lines, splits_by_line, tol, next_node_id)
+    new_lines, new_members, mother_to_children, child_to_mother, next_line_id = buildChildren(
+        new_lines, new_members, splits_by_line, next_line_id
+    )
+    augmentMappingsWithExistingSegments(new_nodes, new_lines, mother_to_children, child_to_mother, tol=tol)
+    return new_nodes, new_lines, new_members, mother_to_children, child_to_mother
+
+
+def randomModel(rng, n_lines, offset):
+    """Lines between grid points; nodes are shared by coordinate like the Revit export."""
+    nodes, lines, members = {}, {}, {}
+    node_at = {}
+
+    def node(x, y, z):
+        key = (x, y, z)
+        if key not in node_at:
+            nid = len(node_at) + 1
+            node_at[key] = nid
+            nodes[nid] = {"id": nid, "x": x, "y": y, "z": z}
+        return node_at[key]
+
+    while len(lines) < n_lines:
+        z = float(rng.randint(0, 2))
+        a = (offset + rng.randint(0, 12) * 0.5, offset + rng.randint(0, 12) * 0.5)
+        b = (offset + rng.randint(0, 12) * 0.5, offset + rng.randint(0, 12) * 0.5)
+        if a == b:
+            continue
+        lid = len(lines) + 1
+        lines[lid] = {"id": lid, "Ni": node(*a, z), "Nj": node(*b, z)}
+        members[lid] = {"line_id": lid, "cross_section_id": rng.randint(1, 3), "material_name": "Steel"}
+    return nodes, lines, members
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_connect_lines_matches_all_pairs_scan(seed):
+    rng = random.Random(seed)
+    offset = 1e5 if seed % 2 else 0.0
+    nodes, lines, members = randomModel(rng, rng.randint(2, 60), offset)
+    assert connect_lines_at_intersections(nodes, lines, members, tol=TOL) == allPairsConnect(
+        nodes, lines, members, TOL
+    )
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_box_tree_query_matches_all_pairs_overlap(seed):
+    rng = random.Random(seed)
+    offset = 1e5 if seed % 2 else 0.0
+    segs = []
+    for _ in range(rng.randint(1, 150)):
+        coords = [offset + rng.randint(0, 12) * 0.5 for _ in range(4)]
+        segs.append(coords)
+    boxes = [planBox(*coords, TOL) for coords in segs]
+    tree = buildBoxTree(boxes, node_size=rng.choice((2, 4, 16)))
+    for i, box in enumerate(boxes):
+        expected = {j for j, other in enumerate(boxes) if boxesOverlap(box, other)}
+        got = queryBoxTree(tree, box)
+        assert len(got) == len(expected) and set(got) == expected
+        # Padding: every pair segmentIntersectionXY accepts must survive the box test
+        ax, ay, bx, by = segs[i]
+        for j, (cx, cy, dx, dy) in enumerate(segs):
+            if segmentIntersectionXY((ax, ay), (bx, by), (cx, cy), (dx, dy), TOL) is not None:
+                assert j in expected, f"lines {i} and {j} intersect but their boxes do not overlap"
+
+
+def test_empty_tree():
+    assert buildBoxTree([]) is None
+    assert queryBoxTree(None, (0.0, 1.0, 0.0, 1.0)) == []